@@ -1,10 +1,38 @@
-from .base import (
-    ActionEvent,
-    Episode,
-    V1Action,
-    V1ToolRef,
-    V1ActionEvent,
-    V1ActionSelection,
-    V1Episode,
-    V1Prompt,
-)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import (
+        ActionEvent,
+        Episode,
+        V1Action,
+        V1ToolRef,
+        V1ActionEvent,
+        V1ActionSelection,
+        V1Episode,
+        V1Prompt,
+    )
+
+__all__ = [
+    "ActionEvent",
+    "Episode",
+    "V1Action",
+    "V1ToolRef",
+    "V1ActionEvent",
+    "V1ActionSelection",
+    "V1Episode",
+    "V1Prompt",
+]
+
+_LAZY_NAMES = frozenset(__all__)
+
+
+def __getattr__(name: str):
+    # Importing .base connects to the database, so defer it until one of its
+    # names is actually used
+    if name in _LAZY_NAMES:
+        from . import base
+
+        value = getattr(base, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
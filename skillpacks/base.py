@@ -1,11 +1,19 @@
 import time
-from typing import Dict, Any, Optional, List
-import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Callable
+import secrets
 import json
 
 from mllm import Prompt, V1Prompt
-from sqlalchemy import asc
-
+from mllm.db.models import PromptRecord
+from pydantic import TypeAdapter
+from pydantic_core import from_json, to_json
+from sqlalchemy import asc, delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload, Session
+
+from .config import DB_TRUST_JSON
 from .db.conn import WithDB
 from .db.models import ActionRecord, EpisodeRecord
 from .server.models import (
@@ -16,10 +24,153 @@ from .server.models import (
     V1Episode,
 )
 
+_ACTION_ADAPTER = TypeAdapter(V1Action)
+_TOOL_ADAPTER = TypeAdapter(V1ToolRef)
+_ACTION_EVENTS_ADAPTER = TypeAdapter(List[V1ActionEvent])
+
+# Marks a lazily decoded field whose JSON has not been parsed yet
+_UNSET: Any = object()
+
+
+class _LazyJSON:
+    """A field stored as raw JSON and decoded the first time it is read.
+
+    Until then the JSON is reused when saving rather than encoding the value
+    again. Once the value has been handed out it may be changed in place, so it
+    is encoded afresh on every save.
+    """
+
+    def __init__(
+        self, decode: Callable[[str], Any], encode: Callable[[Any], str]
+    ) -> None:
+        self.decode = decode
+        self.encode = encode
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.value_attr = "_" + name
+        self.json_attr = "_" + name + "_json"
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        value = getattr(obj, self.value_attr)
+        if value is _UNSET:
+            value = self.decode(getattr(obj, self.json_attr))
+            setattr(obj, self.value_attr, value)
+            setattr(obj, self.json_attr, None)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        setattr(obj, self.value_attr, value)
+        setattr(obj, self.json_attr, None)
+
+    def set_json(self, obj: Any, data: str) -> None:
+        """Stores raw JSON on the instance, to be decoded on first access."""
+        setattr(obj, self.json_attr, data)
+        setattr(obj, self.value_attr, _UNSET)
+
+    def get_json(self, obj: Any) -> str:
+        """Returns the field as JSON, encoding it only if needed."""
+        data = getattr(obj, self.json_attr)
+        if data is None:
+            data = self.encode(getattr(obj, self.value_attr))
+        return data
+
+
+def _decode_action(data: str) -> V1Action:
+    if DB_TRUST_JSON:
+        return V1Action.model_construct(**from_json(data))
+    return _ACTION_ADAPTER.validate_json(data)
+
+
+def _encode_action(action: V1Action) -> str:
+    return _ACTION_ADAPTER.dump_json(action).decode()
+
+
+def _decode_tool(data: str) -> V1ToolRef:
+    if DB_TRUST_JSON:
+        return V1ToolRef.model_construct(**from_json(data))
+    return _TOOL_ADAPTER.validate_json(data)
+
+
+def _encode_tool(tool: V1ToolRef) -> str:
+    return _TOOL_ADAPTER.dump_json(tool).decode()
+
+
+def _encode_json(value: Any) -> str:
+    return to_json(value).decode()
+
+
+def _save_prompts(prompts: List[Prompt]) -> None:
+    """Saves a batch of prompts in a single transaction."""
+    if not prompts:
+        return
+    for db in Prompt.get_db():
+        # Load the existing rows in one query, holding a reference so merge()
+        # finds them in the identity map rather than issuing a SELECT per prompt
+        ids = [prompt.id for prompt in prompts]
+        _existing = db.query(PromptRecord).filter(PromptRecord.id.in_(ids)).all()
+        for prompt in prompts:
+            db.merge(prompt.to_record())
+        db.commit()
+
+
+def _upsert(db: Session, model: Any, rows: List[Dict[str, Any]]) -> None:
+    """Inserts rows into the model's table, updating any that already exist."""
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = pg_insert(model.__table__)
+    else:
+        stmt = sqlite_insert(model.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={column: stmt.excluded[column] for column in rows[0] if column != "id"},
+    )
+    db.execute(stmt, rows)
+
+
+def _find_prompts(ids: Iterable[str]) -> Dict[str, Prompt]:
+    """Finds a batch of prompts by ID in a single query."""
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    found: Dict[str, Prompt] = {}
+    for db in Prompt.get_db():
+        records = db.query(PromptRecord).filter(PromptRecord.id.in_(ids)).all()
+        found = {str(record.id): Prompt.from_record(record) for record in records}
+    return found
+
 
 class ActionEvent(WithDB):
     """An action taken by an agent."""
 
+    __slots__ = (
+        "id",
+        "prompt",
+        "_action",
+        "_action_json",
+        "_result",
+        "_result_json",
+        "_tool",
+        "_tool_json",
+        "namespace",
+        "_metadata",
+        "_metadata_json",
+        "created",
+        "approved",
+        "flagged",
+        "owner_id",
+        "model",
+        "agent_id",
+    )
+
+    # Decoded from their database columns only when first read
+    action = _LazyJSON(_decode_action, _encode_action)
+    result = _LazyJSON(from_json, _encode_json)
+    tool = _LazyJSON(_decode_tool, _encode_tool)
+    metadata = _LazyJSON(from_json, _encode_json)
+
     def __init__(
         self,
         prompt: Prompt,
@@ -27,20 +178,20 @@ class ActionEvent(WithDB):
         tool: V1ToolRef,
         result: Optional[Any] = None,
         namespace: str = "default",
-        metadata: dict = {},
+        metadata: Optional[dict] = None,
         approved: bool = False,
         flagged: bool = False,
         owner_id: Optional[str] = None,
         model: Optional[str] = None,
         agent_id: Optional[str] = None,
     ) -> None:
-        self.id = str(uuid.uuid4())
+        self.id = secrets.token_hex(16)
         self.prompt = prompt
         self.action = action
         self.result = result
         self.tool = tool
         self.namespace = namespace
-        self.metadata = metadata
+        self.metadata = metadata or {}
         self.created = time.time()
         self.approved = approved
         self.flagged = flagged
@@ -53,10 +204,18 @@ class ActionEvent(WithDB):
         self.prompt.approved = True
         self.save()
 
-    def to_v1(self) -> V1ActionEvent:
-        return V1ActionEvent(
+    def to_v1(self, prompts: Optional[Dict[str, V1Prompt]] = None) -> V1ActionEvent:
+        # Reuse the prompt if another event sharing it was already converted
+        if prompts is None:
+            prompt = self.prompt.to_v1()
+        else:
+            prompt = prompts.get(self.prompt.id)
+            if prompt is None:
+                prompt = prompts[self.prompt.id] = self.prompt.to_v1()
+        # Fields are already validated models or plain values, skip revalidation
+        return V1ActionEvent.model_construct(
             id=self.id,
-            prompt=self.prompt.to_v1(),
+            prompt=prompt,
             action=self.action,
             result=self.result,
             tool=self.tool,
@@ -89,24 +248,47 @@ class ActionEvent(WithDB):
         event.metadata = v1.metadata
         return event
 
+    @classmethod
+    def from_json_list(
+        cls, data: str | bytes, owner_id: Optional[str] = None
+    ) -> List["ActionEvent"]:
+        """Creates instances from a JSON array of V1ActionEvents
+
+        The whole array is parsed and validated in a single call, rather than
+        validating each event separately.
+
+        Args:
+            data (str | bytes): A JSON array of V1ActionEvents
+            owner_id (str, optional): Owner of the events. Defaults to None.
+
+        Returns:
+            List[ActionEvent]: The action events
+        """
+        v1s = _ACTION_EVENTS_ADAPTER.validate_json(data)
+        return [cls.from_v1(v1, owner_id) for v1 in v1s]
+
     def save(self) -> None:
         """Saves the instance to the database."""
-        for db in self.get_db():
-            record = self.to_record()
-            db.merge(record)
+        self.prompt.save()
+        with self.session() as db:
+            # Upsert rather than merge, merge() SELECTs the row before writing it
+            _upsert(db, ActionRecord, [self.to_row()])
             db.commit()
 
     def to_record(self) -> ActionRecord:
         """Converts the instance to a database record."""
-        self.prompt.save()
-        return ActionRecord(
+        return ActionRecord(**self.to_row())
+
+    def to_row(self) -> Dict[str, Any]:
+        """Converts the instance to a mapping of column values."""
+        return dict(
             id=self.id,
             prompt_id=self.prompt.id,
-            action=json.dumps(self.action.model_dump()),
-            result=json.dumps(self.result),
-            tool=json.dumps(self.tool.model_dump()),
+            action=ActionEvent.action.get_json(self),
+            result=ActionEvent.result.get_json(self),
+            tool=ActionEvent.tool.get_json(self),
             namespace=self.namespace,
-            metadata_=json.dumps(self.metadata),
+            metadata_=ActionEvent.metadata.get_json(self),
             approved=self.approved,
             flagged=self.flagged,
             created=self.created,
@@ -116,16 +298,29 @@ class ActionEvent(WithDB):
         )
 
     @classmethod
-    def from_record(cls, record: ActionRecord) -> "ActionEvent":
-        """Creates an instance from a database record using the __new__ method."""
+    def from_record(
+        cls, record: ActionRecord, prompt: Optional[Prompt] = None
+    ) -> "ActionEvent":
+        """Creates an instance from a database record using the __new__ method.
+
+        Args:
+            record (ActionRecord): The action record
+            prompt (Prompt, optional): A preloaded prompt for the record, looked
+                up from the database if not given. Defaults to None.
+
+        Returns:
+            ActionEvent: The action event
+        """
         event = cls.__new__(cls)
         event.id = record.id
-        event.prompt = Prompt.find(id=str(record.prompt_id))[0]
-        event.action = V1Action.model_validate_json(str(record.action))
-        event.result = json.loads(str(record.result))
-        event.tool = V1ToolRef.model_validate_json(str(record.tool))
+        if prompt is None:
+            prompt = Prompt.find(id=str(record.prompt_id))[0]
+        event.prompt = prompt
+        cls.action.set_json(event, str(record.action))
+        cls.result.set_json(event, str(record.result))
+        cls.tool.set_json(event, str(record.tool))
         event.namespace = record.namespace
-        event.metadata = json.loads(str(record.metadata_))
+        cls.metadata.set_json(event, str(record.metadata_))
         event.created = record.created
         event.approved = record.approved
         event.flagged = record.flagged
@@ -136,30 +331,47 @@ class ActionEvent(WithDB):
 
     @classmethod
     def find(cls, tool: Optional[V1ToolRef] = None, **kwargs) -> List["ActionEvent"]:
-        for db in cls.get_db():
-            records = (
-                db.query(ActionRecord)
-                .filter_by(**kwargs)
-                .order_by(asc(ActionRecord.created))
-                .all()
-            )
-            out = [cls.from_record(record) for record in records]
-            if tool:
-                out = [
-                    action
-                    for action in out
-                    if action.tool.model_dump() == tool.model_dump()
-                ]
-            return out
+        return list(cls.find_iter(tool=tool, **kwargs))
 
-        raise ValueError("no session")
+    @classmethod
+    def find_iter(
+        cls, tool: Optional[V1ToolRef] = None, batch_size: int = 100, **kwargs
+    ) -> Iterator["ActionEvent"]:
+        """Finds action events, streaming them from the database in batches
+
+        Args:
+            tool (V1ToolRef, optional): Only return actions on this tool. Defaults to None.
+            batch_size (int, optional): Rows fetched per round-trip. Defaults to 100.
+
+        Yields:
+            ActionEvent: The matching action events
+        """
+        stmt = (
+            select(ActionRecord)
+            .filter_by(**kwargs)
+            .order_by(asc(ActionRecord.created))
+            .execution_options(yield_per=batch_size)
+        )
+        if tool:
+            # Match both the compact JSON written now and the json.dumps form
+            # written by earlier versions
+            stmt = stmt.where(
+                ActionRecord.tool.in_(
+                    [_encode_tool(tool), json.dumps(tool.model_dump())]
+                )
+            )
+        with cls.session() as db:
+            result = db.execute(stmt)
+            for records in result.scalars().partitions():
+                prompts = _find_prompts(str(record.prompt_id) for record in records)
+                for record in records:
+                    yield cls.from_record(record, prompts.get(str(record.prompt_id)))
 
     def delete(self) -> None:
         """Deletes the instance from the database."""
-        for db in self.get_db():
-            record = db.query(ActionRecord).filter(ActionRecord.id == self.id).first()
-            if record:
-                db.delete(record)
+        with self.session() as db:
+            result = db.execute(delete(ActionRecord).where(ActionRecord.id == self.id))
+            if result.rowcount:
                 db.commit()
             else:
                 raise ValueError("Record not found")
@@ -168,27 +380,47 @@ class ActionEvent(WithDB):
 class Episode(WithDB):
     """An agent episode"""
 
+    __slots__ = (
+        "id",
+        "actions",
+        "_action_positions",
+        "_pending",
+        "created",
+        "updated",
+        "remote",
+        "tags",
+        "labels",
+        "owner_id",
+    )
+
     def __init__(
         self,
-        actions: List[ActionEvent] = [],
+        actions: Optional[List[ActionEvent]] = None,
         remote: Optional[str] = None,
-        tags: List[str] = [],
-        labels: Dict[str, Any] = {},
+        tags: Optional[List[str]] = None,
+        labels: Optional[Dict[str, Any]] = None,
         owner_id: Optional[str] = None,
     ) -> None:
-        self.id = str(uuid.uuid4())
-        self.actions = actions
-        self.created = time.time()
-        self.updated = time.time()
+        self.id = secrets.token_hex(16)
+        self.actions = actions or []
+        self._action_positions = {
+            action.id: pos for pos, action in enumerate(self.actions)
+        }
+        self._pending = None
+        now = time.time()
+        self.created = now
+        self.updated = now
         self.remote = remote
-        self.tags = tags
-        self.labels = labels
+        self.tags = tags or []
+        self.labels = labels or {}
         self.owner_id = owner_id
 
     def to_v1(self) -> V1Episode:
         """Converts the instance to a V1Episode."""
-        return V1Episode(
-            actions=[action.to_v1() for action in self.actions],
+        prompts: Dict[str, V1Prompt] = {}
+        return V1Episode.model_construct(
+            id=self.id,
+            actions=[action.to_v1(prompts) for action in self.actions],
             tags=self.tags,
             labels=self.labels,
         )
@@ -197,22 +429,53 @@ class Episode(WithDB):
     def from_v1(cls, v1: V1Episode, owner_id: Optional[str] = None) -> "Episode":
         """Creates an instance from a V1Episode object."""
         episode = cls.__new__(cls)
-        episode.id = str(
-            uuid.uuid4()
-        )  # Generate a new ID or retrieve from context if needed
+        episode.id = v1.id or secrets.token_hex(16)
         episode.actions = [ActionEvent.from_v1(action) for action in v1.actions]
+        episode._action_positions = {
+            action.id: pos for pos, action in enumerate(episode.actions)
+        }
+        episode._pending = None
         episode.tags = v1.tags
         episode.labels = v1.labels
-        episode.created = time.time()
-        episode.updated = time.time()
+        now = time.time()
+        episode.created = now
+        episode.updated = now
         episode.owner_id = owner_id
         return episode
 
     def record_event(self, action: ActionEvent) -> None:
         """Records an action to the episode."""
-        self.actions.append(action)
+        self.record_many([action])
+
+    def record_many(self, actions: List[ActionEvent]) -> None:
+        """Records several actions to the episode, saving them together."""
+        for action in actions:
+            self._action_positions[action.id] = len(self.actions)
+            self.actions.append(action)
         self.updated = time.time()
-        self.save()
+        if self._pending is not None:
+            self._pending.extend(actions)
+        else:
+            self._save_actions(actions)
+
+    @contextmanager
+    def batch(self) -> Iterator["Episode"]:
+        """Defers saving the actions recorded inside the block until it exits.
+
+        Example:
+            with episode.batch():
+                for prompt, action in steps:
+                    episode.record(prompt, action, tool)
+        """
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = []
+        try:
+            yield self
+        finally:
+            pending, self._pending = self._pending, None
+            self._save_actions(pending)
 
     def record(
         self,
@@ -221,7 +484,7 @@ class Episode(WithDB):
         tool: V1ToolRef,
         result: Optional[Any] = None,
         namespace: str = "default",
-        metadata: dict = {},
+        metadata: Optional[dict] = None,
         owner_id: Optional[str] = None,
         model: Optional[str] = None,
         agent_id: Optional[str] = None,
@@ -246,34 +509,125 @@ class Episode(WithDB):
         return event
 
     def save(self) -> None:
-        """Saves the instance to the database."""
-        for db in self.get_db():
-            record = self.to_record()
-            db.merge(record)
+        """Saves the instance to the database.
+
+        Actions that were removed from the episode are deleted.
+        """
+        self._save_actions(self.actions, prune=True)
+
+    def _save_actions(
+        self,
+        actions: List[ActionEvent],
+        prompts: Optional[List[Prompt]] = None,
+        prune: bool = False,
+    ) -> None:
+        """Saves the episode row along with the given subset of its actions.
+
+        Args:
+            actions (List[ActionEvent]): The actions to save
+            prompts (List[Prompt], optional): The prompts to save, when the caller
+                knows which ones changed. Defaults to those of every action.
+            prune (bool, optional): Delete the episode's stored actions that are
+                not in actions. Defaults to False.
+        """
+        if prompts is None:
+            prompts = [action.prompt for action in actions]
+        _save_prompts(prompts)
+        with self.session() as db:
+            # Upsert the episode and the actions with one statement per table,
+            # rather than merging each action record
+            _upsert(db, EpisodeRecord, [self.to_row()])
+            _upsert(
+                db,
+                ActionRecord,
+                [dict(action.to_row(), episode_id=self.id) for action in actions],
+            )
+            if prune:
+                db.execute(
+                    delete(ActionRecord).where(
+                        ActionRecord.episode_id == self.id,
+                        ActionRecord.id.not_in([action.id for action in actions]),
+                    )
+                )
+            db.commit()
+
+    @classmethod
+    def bulk_insert(cls, episodes: List["Episode"], batch_size: int = 1000) -> None:
+        """Saves many episodes and their actions
+
+        Prompts are saved first, in their own transaction per batch_size chunk.
+        The episode and action rows are then written in a single transaction,
+        so a failure there leaves the prompts already saved.
+
+        Args:
+            episodes (List[Episode]): The episodes to save
+            batch_size (int, optional): Rows written per statement. Defaults to 1000.
+        """
+        prompts = [action.prompt for episode in episodes for action in episode.actions]
+        for i in range(0, len(prompts), batch_size):
+            _save_prompts(prompts[i : i + batch_size])
+
+        episode_rows = [episode.to_row() for episode in episodes]
+        action_rows = [
+            dict(action.to_row(), episode_id=episode.id)
+            for episode in episodes
+            for action in episode.actions
+        ]
+        with cls.session() as db:
+            for model, rows in (
+                (EpisodeRecord, episode_rows),
+                (ActionRecord, action_rows),
+            ):
+                for i in range(0, len(rows), batch_size):
+                    _upsert(db, model, rows[i : i + batch_size])
             db.commit()
 
     def to_record(self) -> EpisodeRecord:
         """Converts the episode instance to a database record."""
-        episode_record = EpisodeRecord(
+        episode_record = EpisodeRecord(**self.to_row())
+        # Convert all actions to records and associate with this episode record
+        episode_record.actions = [action.to_record() for action in self.actions]
+        return episode_record
+
+    def to_row(self) -> Dict[str, Any]:
+        """Converts the episode instance to a mapping of column values."""
+        return dict(
             id=self.id,
-            tags=json.dumps(self.tags),
-            labels=json.dumps(self.labels),
+            tags=to_json(self.tags).decode(),
+            labels=to_json(self.labels).decode(),
             created=self.created,
             updated=self.updated,
             owner_id=self.owner_id,
         )
-        # Convert all actions to records and associate with this episode record
-        episode_record.actions = [action.to_record() for action in self.actions]
-        return episode_record
 
     @classmethod
-    def from_record(cls, record: EpisodeRecord) -> "Episode":
-        """Creates an episode instance from a database record."""
+    def from_record(
+        cls, record: EpisodeRecord, prompts: Optional[Dict[str, Prompt]] = None
+    ) -> "Episode":
+        """Creates an episode instance from a database record.
+
+        Args:
+            record (EpisodeRecord): The episode record
+            prompts (Dict[str, Prompt], optional): Preloaded prompts keyed by ID,
+                fetched in a single query if not given. Defaults to None.
+
+        Returns:
+            Episode: The episode
+        """
+        if prompts is None:
+            prompts = _find_prompts(str(action.prompt_id) for action in record.actions)
         episode = cls.__new__(cls)
         episode.id = record.id
-        episode.actions = [ActionEvent.from_record(action) for action in record.actions]
-        episode.tags = json.loads(str(record.tags))
-        episode.labels = json.loads(str(record.labels))
+        episode.actions = [
+            ActionEvent.from_record(action, prompts.get(str(action.prompt_id)))
+            for action in record.actions
+        ]
+        episode._action_positions = {
+            action.id: pos for pos, action in enumerate(episode.actions)
+        }
+        episode._pending = None
+        episode.tags = from_json(str(record.tags))
+        episode.labels = from_json(str(record.labels))
         episode.created = record.created
         episode.updated = record.updated
         episode.owner_id = record.owner_id
@@ -281,73 +635,105 @@ class Episode(WithDB):
 
     @classmethod
     def find(cls, **kwargs) -> List["Episode"]:
-        for db in cls.get_db():
-            records = (
-                db.query(EpisodeRecord)
+        return list(cls.find_iter(**kwargs))
+
+    @classmethod
+    def find_iter(cls, batch_size: int = 100, **kwargs) -> Iterator["Episode"]:
+        """Finds episodes, streaming them from the database in batches
+
+        Args:
+            batch_size (int, optional): Episodes fetched per round-trip. Defaults to 100.
+
+        Yields:
+            Episode: The matching episodes
+        """
+        with cls.session() as db:
+            result = db.execute(
+                select(EpisodeRecord)
+                .options(selectinload(EpisodeRecord.actions))
                 .filter_by(**kwargs)
                 .order_by(asc(EpisodeRecord.created))
-                .all()
+                .execution_options(yield_per=batch_size)
             )
-            return [cls.from_record(record) for record in records]
-
-        raise ValueError("no session")
+            for records in result.scalars().partitions():
+                prompts = _find_prompts(
+                    str(action.prompt_id)
+                    for record in records
+                    for action in record.actions
+                )
+                for record in records:
+                    yield cls.from_record(record, prompts)
 
     def get_event(self, id: str) -> ActionEvent:
         """Retrieves a single action event by ID."""
-        for db in self.get_db():
-            record = db.query(ActionRecord).filter(ActionRecord.id == id).first()
+        # The episode's own actions are already loaded, and saved whenever the
+        # episode changes them, so only go to the database for other events
+        pos = self._find_position(id)
+        if pos is not None:
+            return self.actions[pos]
+        with self.session() as db:
+            record = db.get(ActionRecord, id)
             if record:
                 return ActionEvent.from_record(record)
             raise ValueError("No action event found with id " + id)
-        raise ValueError("no session")
 
     def delete(self) -> None:
         """Deletes the episode and all associated actions from the database."""
-        for db in self.get_db():
-            # Delete all associated action records first
-            action_records = (
-                db.query(ActionRecord).filter(ActionRecord.episode_id == self.id).all()
-            )
-            for action_record in action_records:
-                db.delete(action_record)
+        with self.session() as db:
+            # Delete all associated action records first, in a single statement
+            db.execute(delete(ActionRecord).where(ActionRecord.episode_id == self.id))
 
             # Now delete the episode record
-            episode_record = (
-                db.query(EpisodeRecord).filter(EpisodeRecord.id == self.id).first()
+            result = db.execute(
+                delete(EpisodeRecord).where(EpisodeRecord.id == self.id)
             )
-            if episode_record:
-                db.delete(episode_record)
+            if result.rowcount:
                 db.commit()
             else:
                 raise ValueError("Episode record not found")
 
     def approve_one(self, event_id: str) -> None:
         """Approve the given event."""
-        for event in self.actions:
-            if event.id == event_id:
-                event.approved = True
-                event.prompt.approved = True
-                event.save()
-                break
+        pos = self._find_position(event_id)
+        if pos is not None:
+            self.actions[pos].approve()
+
+    def _find_position(self, event_id: str) -> Optional[int]:
+        """Finds the position of one of the episode's actions by ID."""
+        pos = self._action_positions.get(event_id)
+        # actions is a public list that can be changed directly rather than
+        # through record_event, so check the hit and rebuild the index if stale
+        if pos is None or pos >= len(self.actions) or self.actions[pos].id != event_id:
+            self._action_positions = {
+                action.id: pos for pos, action in enumerate(self.actions)
+            }
+            pos = self._action_positions.get(event_id)
+        return pos
 
     def approve_all(self) -> None:
         """Approve all actions in the episode."""
-        for event in self.actions:
-            event.approved = True
-            event.prompt.approved = True
-            event.save()
-        self.save()
+        self._approve(self.actions)
 
     def approve_prior(self, event_id: str) -> None:
         """Approve the given event and all prior actions."""
-        self.approve_one(event_id)
-        for i in range(len(self.actions) - 1):
-            if self.actions[i].id == event_id:
-                for j in range(i + 1, len(self.actions)):
-                    self.actions[j].approved = True
-                    self.actions[j].prompt.approved = True
-                    self.actions[j].save()
-        self.save()
+        pos = self._find_position(event_id)
+        if pos is None:
+            return
+        self._approve(self.actions[: pos + 1])
+
+    def _approve(self, events: List[ActionEvent]) -> None:
+        """Approves the events, writing only the ones that changed."""
+        changed = [
+            event for event in events if not (event.approved and event.prompt.approved)
+        ]
+        if not changed:
+            return
+        # Only the prompts being approved here need writing
+        prompts = [event.prompt for event in changed if not event.prompt.approved]
+        for event in changed:
+            event.approved = True
+            event.prompt.approved = True
+        self._save_actions(changed, prompts)
 
     def approved_actions(self) -> List[ActionEvent]:
         """Returns a list of approved actions."""
@@ -17,5 +17,8 @@ AGENTSEA_PROC_DIR = os.path.expanduser(
 )
 DB_TEST = os.environ.get("AGENTSEA_DB_TEST", "false") == "true"
 DB_NAME = os.environ.get("SKILLS_DB_NAME", "skills.db")
+# Rows are written from validated models, so they can optionally be rebuilt
+# without re-running validation
+DB_TRUST_JSON = os.environ.get("SKILLS_DB_TRUST_JSON", "false") == "true"
 if DB_TEST:
     DB_NAME = f"skills_test_{int(time.time())}.db"
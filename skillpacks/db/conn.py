@@ -1,9 +1,11 @@
 import os
 import time
 import logging
+from contextlib import contextmanager
+from typing import Iterator
 
-from sqlalchemy import create_engine, Engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.orm import sessionmaker, Session
 
 from .models import Base
 from skillpacks.config import DB_NAME, AGENTSEA_DB_DIR
@@ -44,6 +46,16 @@ def get_sqlite_conn() -> Engine:
     logger.debug(f"connecting to local sqlite db {db_path}")
     os.makedirs(AGENTSEA_DB_DIR, exist_ok=True)
     engine = create_engine(f"sqlite:///{db_path}")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        # WAL lets readers run alongside a writer, and with it NORMAL sync only
+        # fsyncs at checkpoints rather than on every commit
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
     return engine
 
 
@@ -57,6 +69,8 @@ Base.metadata.create_all(bind=engine)
 
 
 class WithDB:
+    __slots__ = ()
+
     @staticmethod
     def get_db():
         """Get a database connection
@@ -73,6 +87,23 @@ class WithDB:
         finally:
             db.close()
 
+    @staticmethod
+    @contextmanager
+    def session() -> Iterator[Session]:
+        """Get a database session that is closed when the block exits
+
+        Example:
+            ```
+            with self.session() as db:
+                db.add(foo)
+            ```
+        """
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
 
 def get_db():
     """Get a database connection
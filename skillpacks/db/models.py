@@ -1,6 +1,16 @@
 import time
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, Text, Boolean, Float
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    Table,
+    Text,
+    Boolean,
+    Float,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import JSONB  # If using PostgreSQL
@@ -10,6 +20,10 @@ Base = declarative_base()
 
 class ActionRecord(Base):
     __tablename__ = "actions"
+    __table_args__ = (
+        Index("ix_actions_owner_id_created", "owner_id", "created"),
+        Index("ix_actions_episode_id_created", "episode_id", "created"),
+    )
 
     id = Column(String, primary_key=True)
     owner_id = Column(String, nullable=True)
@@ -31,6 +45,7 @@ class ActionRecord(Base):
 
 class EpisodeRecord(Base):
     __tablename__ = "episodes"
+    __table_args__ = (Index("ix_episodes_owner_id_created", "owner_id", "created"),)
 
     id = Column(String, primary_key=True)
     owner_id = Column(String, nullable=True)
@@ -38,13 +53,10 @@ class EpisodeRecord(Base):
     labels = Column(Text, default=list)
     created = Column(Float, default=time.time)
     updated = Column(Float, default=time.time)
-    actions = relationship(
-        "ActionRecord", order_by=ActionRecord.id, back_populates="episode"
-    )
-
     actions = relationship(
         "ActionRecord",
-        order_by=ActionRecord.id,
+        order_by=ActionRecord.created,
         back_populates="episode",
         cascade="all, delete-orphan",
+        lazy="selectin",
     )
@@ -3,6 +3,8 @@ import logging
 
 import requests
 
+logger = logging.getLogger(__name__)
+
 api_key = os.getenv("OPENAI_API_KEY")
 if api_key is None:
     raise SystemError("$OPENAI_API_KEY not found.")
@@ -16,17 +18,15 @@ def chat(msgs: list) -> dict:
         "max_tokens": 500,
     }
 
-    logging.debug("making request: ", payload)
+    # Payloads carry base64 screenshots, only format them when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("making request: %s", payload)
 
     response = requests.post(
         "https://api.openai.com/v1/chat/completions", headers=headers, json=payload
     )
-    logging.debug("response: ", response)
-    try:
-        logging.debug("response text: ", response.text)
-    except Exception:
-        pass
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("response: %s %s", response, response.text)
     response.raise_for_status()
-    logging.debug("response text: ", response.text)
 
     return response.json()["choices"][0]["message"]
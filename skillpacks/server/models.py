@@ -76,6 +76,7 @@ class V1CreateActionEvent(BaseModel):
 class V1Episode(BaseModel):
     """An agent episode"""
 
+    id: Optional[str] = None
     actions: List[V1ActionEvent] = []
     tags: List[str] = []
     labels: Dict[str, Any] = {}
@@ -50,10 +50,13 @@ async def get_action_event(
 async def get_action_events(
     current_user: Annotated[V1UserProfile, Depends(get_current_user)],
 ):
-    events = ActionEvent.find(owner_id=current_user.email)
+    # Convert while streaming, so only one batch of events is hydrated at once
+    events = [
+        event.to_v1() for event in ActionEvent.find_iter(owner_id=current_user.email)
+    ]
     if not events:
         raise HTTPException(status_code=404, detail="Action event not found")
-    return V1ActionEvents(events=[event.to_v1() for event in events])
+    return V1ActionEvents(events=events)
 
 
 @router.delete("/v1/actions/{id}")
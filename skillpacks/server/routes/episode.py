@@ -19,7 +19,9 @@ router = APIRouter()
 async def create_episode(
     current_user: Annotated[V1UserProfile, Depends(get_current_user)], data: V1Episode
 ):
-    episode = Episode.from_v1(data)
+    # Always create a new episode; saving under a client-supplied ID would
+    # overwrite any existing episode with that ID
+    episode = Episode.from_v1(data.model_copy(update={"id": None}))
     episode.owner_id = current_user.email
     episode.save()
     return episode.to_v1()
@@ -57,10 +59,9 @@ async def record_event(
         flagged=data.flagged,
         owner_id=current_user.email,
     )
-    event.save()
-
+    # Upserts the episode row and the new action record together, so this is
+    # the only commit needed
     episode.record_event(event)
-    episode.save()
     return episode.to_v1()
 
 
@@ -68,10 +69,13 @@ async def record_event(
 async def get_episodes(
     current_user: Annotated[V1UserProfile, Depends(get_current_user)],
 ):
-    episodes = Episode.find(owner_id=current_user.email)
+    # Convert while streaming, so only one batch of episodes is hydrated at once
+    episodes = [
+        episode.to_v1() for episode in Episode.find_iter(owner_id=current_user.email)
+    ]
     if not episodes:
         raise HTTPException(status_code=404, detail="Action event not found")
-    return V1Episodes(episodes=[event.to_v1() for event in episodes])
+    return V1Episodes(episodes=episodes)
 
 
 @router.delete("/v1/episodes/{id}")
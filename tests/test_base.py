@@ -1,7 +1,30 @@
 from mllm import Prompt, RoleThread, RoleMessage
+from sqlalchemy import event as sa_event
 from skillpacks import Episode, ActionEvent, V1Action
+from skillpacks.db.conn import engine
+import skillpacks.base
 from toolfuse.models import V1ToolRef
 
+TOOL = V1ToolRef(module="agentdesk", type="Desktop", version="0.1.2")
+
+
+def new_event(app: str) -> ActionEvent:
+    thread = RoleThread()
+    thread.post("user", "What action should I take to open the browser?")
+    response = RoleMessage("assistant", "you should take this action...")
+    return ActionEvent(
+        Prompt(thread, response),
+        V1Action(name="open_browser", parameters={"app": app}),
+        TOOL,
+    )
+
+
+def record_events(episode: Episode, apps: list) -> list:
+    events = [new_event(app) for app in apps]
+    for event in events:
+        episode.record_event(event)
+    return events
+
 
 def test_all():
     thread = RoleThread()
@@ -36,3 +59,203 @@ def test_all():
 
     event1_found = episode.get_event(event1.id)
     assert event1_found.approved == True
+
+
+def test_find_hydrates_prompts():
+    episode = Episode()
+    events = record_events(episode, ["chrome", "firefox", "safari"])
+
+    found = Episode.find(id=episode.id)
+    assert len(found) == 1
+    assert [event.id for event in found[0].actions] == [event.id for event in events]
+    for found_event, event in zip(found[0].actions, events):
+        assert found_event.prompt.id == event.prompt.id
+        assert found_event.action == event.action
+
+    found_events = ActionEvent.find(id=events[1].id)
+    assert len(found_events) == 1
+    assert found_events[0].prompt.id == events[1].prompt.id
+
+    assert len(ActionEvent.find(id=events[1].id, tool=TOOL)) == 1
+    tool = V1ToolRef(module="agentdesk", type="Desktop", version="0.1.3")
+    assert ActionEvent.find(id=events[1].id, tool=tool) == []
+
+
+def test_from_json_list():
+    events = [new_event(app) for app in ["chrome", "firefox"]]
+    data = "[" + ",".join(event.to_v1().model_dump_json() for event in events) + "]"
+
+    loaded = ActionEvent.from_json_list(data, owner_id="tom@myspace.com")
+    assert [event.id for event in loaded] == [event.id for event in events]
+    assert loaded[1].action == events[1].action
+    assert loaded[0].owner_id == "tom@myspace.com"
+
+
+def test_bulk_insert():
+    episodes = []
+    for apps in [["chrome"], ["firefox", "safari"], []]:
+        episode = Episode()
+        episode.actions.extend(new_event(app) for app in apps)
+        episodes.append(episode)
+
+    Episode.bulk_insert(episodes, batch_size=1)
+
+    for episode in episodes:
+        found = Episode.find(id=episode.id)
+        assert len(found) == 1
+        assert {event.id for event in found[0].actions} == {
+            event.id for event in episode.actions
+        }
+
+
+def test_approve_prior():
+    episode = Episode()
+    events = record_events(episode, ["chrome", "firefox", "safari"])
+
+    episode.approve_prior(events[1].id)
+
+    found = Episode.find(id=episode.id)[0]
+    approved = [found.get_event(event.id).approved for event in events]
+    assert approved == [True, True, False]
+
+
+def test_approve_one():
+    episode = Episode()
+    events = record_events(episode, ["chrome", "firefox"])
+
+    episode.approve_one(events[0].id)
+
+    found = Episode.find(id=episode.id)[0]
+    assert found.get_event(events[0].id).approved
+    assert found.get_event(events[0].id).prompt.approved
+    assert not found.get_event(events[1].id).approved
+
+
+def test_batch():
+    episode = Episode()
+    with episode.batch():
+        events = record_events(episode, ["chrome", "firefox"])
+        assert Episode.find(id=episode.id) == []
+
+    found = Episode.find(id=episode.id)
+    assert len(found) == 1
+    assert {event.id for event in found[0].actions} == {event.id for event in events}
+
+
+def test_lazy_decode():
+    episode = Episode()
+    (event,) = record_events(episode, ["chrome"])
+
+    found = ActionEvent.find(id=event.id)[0]
+    # Nothing is decoded until read, and the stored JSON is written back as is
+    assert found._action is skillpacks.base._UNSET
+    assert found.to_row()["action"] == event.to_row()["action"]
+    assert found.action == event.action
+    assert found.metadata == {}
+
+
+def test_trust_json(monkeypatch):
+    episode = Episode()
+    (event,) = record_events(episode, ["chrome"])
+
+    monkeypatch.setattr(skillpacks.base, "DB_TRUST_JSON", True)
+    found = ActionEvent.find(id=event.id)[0]
+    assert isinstance(found.action, V1Action)
+    assert found.action == event.action
+    assert found.tool == TOOL
+
+
+def test_approve_all_noop():
+    episode = Episode()
+    record_events(episode, ["chrome", "firefox"])
+    episode.approve_all()
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sa_event.listen(engine, "before_cursor_execute", count)
+    try:
+        episode.approve_all()
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count)
+    assert statements == []
+    assert all(event.approved for event in Episode.find(id=episode.id)[0].actions)
+
+
+def test_get_event_from_memory():
+    episode = Episode()
+    events = record_events(episode, ["chrome", "firefox"])
+
+    assert episode.get_event(events[1].id) is events[1]
+    other = record_events(Episode(), ["safari"])[0]
+    assert episode.get_event(other.id).id == other.id
+
+
+def test_save_removes_actions():
+    episode = Episode()
+    events = record_events(episode, ["chrome", "firefox"])
+
+    episode.actions.remove(events[0])
+    episode.save()
+    found = Episode.find(id=episode.id)[0]
+    assert [event.id for event in found.actions] == [events[1].id]
+
+    episode.actions.clear()
+    episode.save()
+    assert Episode.find(id=episode.id)[0].actions == []
+
+
+def test_approve_changed_actions():
+    episode = Episode()
+    first, second = record_events(episode, ["chrome", "firefox"])
+
+    # Appended directly rather than through record_event
+    episode.actions.append(new_event("safari"))
+    episode.approve_one(episode.actions[-1].id)
+    assert episode.actions[-1].approved
+
+    # Replaced in place, keeping the same length
+    episode.actions[0] = new_event("edge")
+    episode.save()
+    episode.approve_one(first.id)
+    episode.approve_prior(first.id)
+    assert not first.approved
+    assert [event.approved for event in episode.actions] == [False, False, True]
+
+    # Removed and another appended, keeping the same length
+    episode.actions.remove(second)
+    episode.actions.append(new_event("opera"))
+    episode.approve_one(second.id)
+    assert not second.approved
+    assert not ActionEvent.find(id=second.id)[0].approved
+
+
+def test_save_action_changed_in_place():
+    episode = Episode()
+    (event,) = record_events(episode, ["chrome"])
+
+    event.action.parameters["app"] = "firefox"
+    event.action.name = "close_browser"
+    event.save()
+    found = ActionEvent.find(id=event.id)[0]
+    assert found.action == event.action
+
+    found.action.parameters["app"] = "safari"
+    found.save()
+    assert ActionEvent.find(id=event.id)[0].action.parameters == {"app": "safari"}
+
+
+def test_save_prompt_changed_in_place():
+    episode = Episode()
+    (event,) = record_events(episode, ["chrome"])
+
+    found = ActionEvent.find(id=event.id)[0]
+    found.approved = True
+    found.prompt.approved = True
+    found.save()
+
+    saved = ActionEvent.find(id=event.id)[0]
+    assert saved.approved
+    assert saved.prompt.approved